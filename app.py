@@ -1,6 +1,8 @@
+import argparse
 import logging
 from controls import Controls
-from mandelbrot import generate_mandelbrot_set
+from kernels import DEFAULT_KERNELS
+from input_trace import ControlsRecorder, InputTrace
 from mandelbrot_visualizer import MandelbrotVisualizer
 import multiprocessing as mp
 from pygame_renderer import PygameRenderer
@@ -15,8 +17,16 @@ logger = logging.getLogger(__name__)
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="PATH", help="record input to a trace file")
+    args = parser.parse_args()
+
     controls = Controls(WorkerType.PROCESS)
-    renderer = PygameRenderer(controls)
+    trace = InputTrace()
+    recorder = ControlsRecorder(controls, trace)
+    renderer = PygameRenderer(recorder if args.record else controls)
+    trace.screen_width = renderer.screen_width
+    trace.screen_height = renderer.screen_height
 
     viz = MandelbrotVisualizer(
         screen_width=renderer.screen_width,
@@ -24,9 +34,14 @@ def main():
         number_of_workers=1 + mp.cpu_count() // 2,
         max_iters=80,
         controls=controls,
-        worker_function=generate_mandelbrot_set,
+        kernels=DEFAULT_KERNELS,
+        max_width=renderer.max_width,
+        max_height=renderer.max_height,
     )
 
+    # Building the visualizer compiles every kernel, which mustn't end up
+    # in the recorded timestamps
+    recorder.start()
     while True:
         renderer.handle_input()
         viz.update()
@@ -38,6 +53,8 @@ def main():
             logger.debug("Quitting.")
             viz.terminate()
             renderer.quit()
+            if args.record:
+                trace.save(args.record)
             break
 
 
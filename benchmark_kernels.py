@@ -0,0 +1,51 @@
+import argparse
+import time
+import numpy as np
+
+from kernels import DEFAULT_KERNELS, KernelVariant
+
+# The app's kernels plus the raw iteration counts the render service uses
+BENCHMARK_KERNELS = DEFAULT_KERNELS + [KernelVariant.of("mandelbrot_iterations")]
+
+# (centerX, centerY, zoom) views, matching how MandelbrotVisualizer maps
+# Controls to the complex plane
+VIEWS = {
+    "overview": (0.0, 0.0, 2.0),
+    "seahorse": (-0.745, 0.1, 0.02),
+    "edge": (-1.25, 0.0, 0.2),
+}
+
+
+def view_coordinates(center_x, center_y, zoom, width, height):
+    zoom_x = zoom + zoom * (height / width)
+    cx = np.linspace(center_x - zoom_x, center_x + zoom_x, width)
+    cy = np.linspace(center_y - zoom, center_y + zoom, height)
+    return cx, cy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every registered kernel variant on a fixed set of views."
+    )
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--max-iters", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pixels = np.zeros((args.width, args.height), dtype=np.uint32)
+    for kernel in BENCHMARK_KERNELS:
+        function = kernel.function
+        for view, (x, y, zoom) in VIEWS.items():
+            cx, cy = view_coordinates(x, y, zoom, args.width, args.height)
+            # First call compiles the specialization
+            function(pixels, cx, cy, args.max_iters, 0, args.height - 1)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                function(pixels, cx, cy, args.max_iters, 0, args.height - 1)
+            ms = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"{kernel.label:<36} {view:<10} {ms:8.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+from enum import IntEnum
+import numba
+import numpy as np
+
+ORBIT_SAMPLES_PER_FRAME = 20_000
+# Orbits are only traced while |z| <= 2; beyond that they can't come back
+# into any interesting view
+BAILOUT_SQ = 4.0
+# Share of Metropolis-Hastings proposals drawn uniformly instead of by
+# mutating the current sample, so the chain can't get stuck in one region
+UNIFORM_PROPOSAL_RATE = 0.2
+# Mutation size relative to the view width
+MUTATION_SCALE = 0.05
+
+
+class RenderMode(IntEnum):
+    ESCAPE_TIME = 0
+    BUDDHABROT = 1
+    ANTI_BUDDHABROT = 2
+
+
+@numba.njit(fastmath=True)
+def _in_main_bulbs(cr, ci):
+    """Main cardioid and period-2 bulb never escape."""
+    q = (cr - 0.25) ** 2 + ci * ci
+    if q * (q + (cr - 0.25)) <= 0.25 * ci * ci:
+        return True
+    return (cr + 1.0) ** 2 + ci * ci <= 0.0625
+
+
+@numba.njit(fastmath=True)
+def _escape_time(cr, ci, max_iters):
+    real = 0.0
+    imag = 0.0
+    for iteration in range(max_iters):
+        real_sq = real * real
+        imag_sq = imag * imag
+        if real_sq + imag_sq > BAILOUT_SQ:
+            return iteration
+        imag = 2.0 * real * imag + ci
+        real = real_sq - imag_sq + cr
+    return -1
+
+
+@numba.njit(fastmath=True)
+def _trace_orbit(hist, cr, ci, steps, x0, y0, sx, sy, weight, splat):
+    """Return how many of the first `steps` orbit points land in the view,
+    adding `weight` to their histogram bins if `splat` is set."""
+    W, H = hist.shape
+    real = 0.0
+    imag = 0.0
+    hits = 0
+    for _ in range(steps):
+        real, imag = real * real - imag * imag + cr, 2.0 * real * imag + ci
+        x = int((real - x0) * sx + 0.5)
+        y = int((imag - y0) * sy + 0.5)
+        if 0 <= x < W and 0 <= y < H:
+            hits += 1
+            if splat:
+                hist[x, y] += weight
+    return hits
+
+
+@numba.njit(fastmath=True)
+def _contribution(hist, cr, ci, max_iters, anti, x0, y0, sx, sy):
+    if not anti and _in_main_bulbs(cr, ci):
+        return 0, 0
+    n = _escape_time(cr, ci, max_iters)
+    if (n >= 0) == anti:
+        return 0, 0
+    # Escaping orbits stop before the point that left the bailout radius
+    steps = n - 1 if n >= 0 else max_iters
+    return _trace_orbit(hist, cr, ci, steps, x0, y0, sx, sy, 0.0, False), steps
+
+
+@numba.njit(fastmath=True)
+def sample_orbits(hist, cx, cy, max_iters, samples, anti, importance):
+    """
+    Accumulate orbits of `samples` random c values into `hist`, either by
+    uniform sampling over [-2, 2]^2 or, with `importance` set, with a
+    Metropolis-Hastings chain that favours c values whose orbits cross the
+    current view. Chain samples are weighted by 1 / contribution so the
+    density stays proportional to the uniform estimate.
+    """
+    W, H = hist.shape
+    if W < 2 or H < 2:
+        return
+    x0 = cx[0]
+    y0 = cy[0]
+    sx = (W - 1) / (cx[W - 1] - x0)
+    sy = (H - 1) / (cy[H - 1] - y0)
+
+    if not importance:
+        for _ in range(samples):
+            cr = np.random.uniform(-2.0, 2.0)
+            ci = np.random.uniform(-2.0, 2.0)
+            hits, steps = _contribution(hist, cr, ci, max_iters, anti, x0, y0, sx, sy)
+            if hits:
+                _trace_orbit(hist, cr, ci, steps, x0, y0, sx, sy, 1.0, True)
+        return
+
+    # Find a starting point whose orbit is visible
+    cr = ci = 0.0
+    hits = steps = 0
+    for _ in range(samples):
+        cr = np.random.uniform(-2.0, 2.0)
+        ci = np.random.uniform(-2.0, 2.0)
+        hits, steps = _contribution(hist, cr, ci, max_iters, anti, x0, y0, sx, sy)
+        if hits:
+            break
+    if not hits:
+        return
+
+    sigma = (cx[W - 1] - x0) * MUTATION_SCALE
+    repeat = 1
+    for _ in range(samples):
+        if np.random.random() < UNIFORM_PROPOSAL_RATE:
+            nr = np.random.uniform(-2.0, 2.0)
+            ni = np.random.uniform(-2.0, 2.0)
+        else:
+            nr = cr + np.random.normal() * sigma
+            ni = ci + np.random.normal() * sigma
+        new_hits, new_steps = _contribution(
+            hist, nr, ni, max_iters, anti, x0, y0, sx, sy
+        )
+        if new_hits and np.random.random() * hits < new_hits:
+            _trace_orbit(hist, cr, ci, steps, x0, y0, sx, sy, repeat / hits, True)
+            cr, ci, hits, steps = nr, ni, new_hits, new_steps
+            repeat = 1
+        else:
+            repeat += 1
+    _trace_orbit(hist, cr, ci, steps, x0, y0, sx, sy, repeat / hits, True)
+
+
+@numba.njit(fastmath=True)
+def reduce_histograms(histograms, density, start_line, end_line):
+    """Sum every worker's histogram into `density` for the given lines and
+    return the peak value found there."""
+    N, W, _ = histograms.shape
+    density[:, start_line : end_line + 1] = 0
+    for i in range(N):
+        for x in range(W):
+            for y in range(start_line, end_line + 1):
+                density[x, y] += histograms[i, x, y]
+    peak = 0.0
+    for x in range(W):
+        for y in range(start_line, end_line + 1):
+            peak = max(peak, density[x, y])
+    return peak
+
+
+@numba.njit(fastmath=True)
+def shade_density(pixels, density, peak, start_line, end_line):
+    """Shade the given lines of `pixels`, upscaling a smaller `density`."""
+    W, H = pixels.shape
+    DW, DH = density.shape
+    scale = 1.0 / peak if peak > 0 else 0.0
+    for y in range(start_line, end_line + 1):
+        dy = y * DH // H
+        for x in range(W):
+            # Square root tone mapping keeps faint orbits visible
+            color = int(255 * np.sqrt(density[x * DW // W, dy] * scale))
+            pixels[x, y] = (color << 16) | (color << 8) | color
+
+
+def warm_up_orbit_density():
+    """Compile the orbit density functions before workers are forked."""
+    hist = np.zeros((2, 2, 2), dtype=np.float32)
+    pixels = np.zeros((2, 2), dtype=np.uint32)
+    coords = np.array([-2.0, 2.0])
+    for importance in (False, True):
+        sample_orbits(hist[0], coords, coords, 1, 1, False, importance)
+    peak = reduce_histograms(hist, hist[1], 0, 1)
+    shade_density(pixels, hist[1], peak, 0, 1)
@@ -1,6 +1,7 @@
 import numpy as np
 from dataclasses import dataclass
 from worker import WorkerType
+from buddhabrot import RenderMode
 
 
 @dataclass
@@ -15,6 +16,9 @@ class Controls:
     pan_start_pos = (0, 0)
     quit = False
     max_iters = 80
+    kernel_index = 0
+    render_mode = RenderMode.ESCAPE_TIME
+    importance_sampling = False
     PAN_SENSITIVITY = 2
     SPEED = 0.0075
     has_switched_workers = False
@@ -51,6 +55,19 @@ class Controls:
         self.max_iters -= 2
         self.max_iters = np.clip(self.max_iters, 50, 500)
 
+    def next_kernel(self):
+        self.kernel_index += 1
+
+    def next_render_mode(self):
+        self.render_mode = RenderMode((self.render_mode + 1) % len(RenderMode))
+
+    def toggle_importance_sampling(self):
+        self.importance_sampling = not self.importance_sampling
+
+    def resize(self, width, height):
+        self.screen_width = width
+        self.screen_height = height
+
     def switch_worker(self):
         self.worker_type = (
             WorkerType.PROCESS
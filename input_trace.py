@@ -0,0 +1,96 @@
+import json
+import time
+from dataclasses import dataclass, field
+
+from controls import Controls
+
+
+@dataclass
+class InputEvent:
+    t: float
+    action: str
+    args: tuple = ()
+
+
+@dataclass
+class InputTrace:
+    """A timestamped sequence of `Controls` actions."""
+
+    screen_width: int = 0
+    screen_height: int = 0
+    events: list[InputEvent] = field(default_factory=list)
+
+    @property
+    def duration(self):
+        return self.events[-1].t if self.events else 0.0
+
+    def save(self, path: str):
+        data = {
+            "screen_width": self.screen_width,
+            "screen_height": self.screen_height,
+            "events": [[e.t, e.action, list(e.args)] for e in self.events],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> "InputTrace":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            screen_width=data["screen_width"],
+            screen_height=data["screen_height"],
+            events=[InputEvent(t, action, tuple(args)) for t, action, args in data["events"]],
+        )
+
+
+class ControlsRecorder:
+    """
+    Stands in for a `Controls` object in front of a renderer and records every
+    action called on it into an `InputTrace`. Attribute reads and writes are
+    forwarded to the wrapped controls. Timestamps count from start(), and
+    actions before it are recorded at t = 0.
+    """
+
+    ACTIONS = {
+        "left",
+        "right",
+        "up",
+        "down",
+        "zoomin",
+        "zoomout",
+        "increase_iters",
+        "decrease_iters",
+        "switch_worker",
+        "next_kernel",
+        "next_render_mode",
+        "toggle_importance_sampling",
+        "start_pan",
+        "stop_pan",
+        "move_pan",
+        "resize",
+    }
+
+    def __init__(self, controls: Controls, trace: InputTrace):
+        object.__setattr__(self, "_controls", controls)
+        object.__setattr__(self, "_trace", trace)
+        object.__setattr__(self, "_start", None)
+
+    def start(self):
+        """Start the clock, once the app is ready to show frames."""
+        object.__setattr__(self, "_start", time.perf_counter())
+
+    def __getattr__(self, name):
+        attr = getattr(self._controls, name)
+        if name not in self.ACTIONS:
+            return attr
+
+        def record(*args):
+            t = 0.0 if self._start is None else time.perf_counter() - self._start
+            self._trace.events.append(InputEvent(t, name, args))
+            return attr(*args)
+
+        return record
+
+    def __setattr__(self, name, value):
+        setattr(self._controls, name, value)
@@ -0,0 +1,202 @@
+import functools
+from dataclasses import dataclass
+from typing import Callable
+import numba
+import numpy as np
+
+from mandelbrot import ESCAPE_RADIUS_SQ, generate_mandelbrot_set
+
+
+@dataclass(frozen=True)
+class Kernel:
+    """A fractal kernel and the parameters its factory is specialized on."""
+
+    name: str
+    factory: Callable
+    params: tuple[str, ...]
+
+
+KERNELS: dict[str, Kernel] = {}
+
+
+def register_kernel(name: str, *params: str):
+    """
+    Register a factory that builds a compiled kernel for one combination of
+    parameter values. Parameters are baked into the compiled code as
+    constants, so every combination gets its own specialization.
+    """
+
+    def decorator(factory):
+        KERNELS[name] = Kernel(name, factory, params)
+        return factory
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def compile_kernel(name: str, params: tuple[tuple[str, object], ...]):
+    kernel = KERNELS[name]
+    given = dict(params)
+    if set(given) != set(kernel.params):
+        raise ValueError(
+            f"{name} kernel takes parameters {kernel.params}, got {tuple(given)}"
+        )
+    return kernel.factory(**given)
+
+
+@dataclass(frozen=True)
+class KernelVariant:
+    """A kernel with fixed parameter values, cheap to pickle into workers."""
+
+    name: str
+    params: tuple[tuple[str, object], ...] = ()
+
+    @classmethod
+    def of(cls, name: str, **params) -> "KernelVariant":
+        return cls(name, tuple(sorted(params.items())))
+
+    @property
+    def function(self):
+        return compile_kernel(self.name, self.params)
+
+    @property
+    def label(self):
+        if not self.params:
+            return self.name
+        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params)})"
+
+
+def warm_up(kernels: list[KernelVariant], strided: bool = False):
+    """
+    Compile every variant up front. Forked workers inherit the compiled code,
+    so switching kernels at runtime doesn't stall on JIT compilation.
+    `strided` also compiles the F and A layouts that jobs written in result
+    order come in.
+    """
+    pixels = np.zeros((3, 3), dtype=np.uint32)
+    layouts = [pixels]
+    if strided:
+        layouts += [pixels.T, pixels.T[:2, :2]]
+    coords = np.zeros(3, dtype=np.float64)
+    for kernel in kernels:
+        for pixels in layouts:
+            kernel.function(pixels, coords, coords, 1, 0, 0)
+
+
+@numba.njit(fastmath=True)
+def shade(iteration, max_iters):
+    # Same grayscale ramp as compute_mandelbrot_pixel
+    color = 255 - int(255 * iteration / max_iters)
+    return (color << 16) | (color << 8) | color
+
+
+def make_generate(compute_pixel):
+    """Build a line-range generator around a kernel's per-pixel function."""
+
+    @numba.njit(fastmath=True)
+    def generate(pixels, cx, cy, max_iters, start_line, end_line):
+        W = pixels.shape[0]
+        for y in range(start_line, end_line + 1):
+            cy_y = cy[y]
+            for x in range(W):
+                pixels[x, y] = compute_pixel(cx[x], cy_y, max_iters)
+
+    return generate
+
+
+@register_kernel("mandelbrot")
+def mandelbrot():
+    return generate_mandelbrot_set
+
+
+@register_kernel("mandelbrot_iterations")
+def mandelbrot_iterations():
+    """Raw escape iteration counts, max_iters for points inside the set."""
+
+    @numba.njit(fastmath=True)
+    def compute_pixel(x, y, max_iters):
+        real = np.float32(0.0)
+        imag = np.float32(0.0)
+        for iteration in range(max_iters):
+            real_sq = real * real
+            imag_sq = imag * imag
+            if real_sq + imag_sq > ESCAPE_RADIUS_SQ:
+                return iteration
+            imag = 2.0 * real * imag + y
+            real = real_sq - imag_sq + x
+        return max_iters
+
+    return make_generate(compute_pixel)
+
+
+@register_kernel("multibrot", "power")
+def multibrot(power: int):
+    if int(power) != power or power < 2:
+        raise ValueError("multibrot power must be an integer >= 2")
+    power = int(power)
+
+    @numba.njit(fastmath=True)
+    def compute_pixel(x, y, max_iters):
+        real = np.float32(0.0)
+        imag = np.float32(0.0)
+        for iteration in range(max_iters):
+            if real * real + imag * imag > ESCAPE_RADIUS_SQ:
+                return shade(iteration, max_iters)
+            # power is a compile-time constant, so this unrolls into
+            # plain complex multiplications
+            zr, zi = real, imag
+            for _ in range(power - 1):
+                zr, zi = zr * real - zi * imag, zr * imag + zi * real
+            real = zr + x
+            imag = zi + y
+        return 0
+
+    return make_generate(compute_pixel)
+
+
+@register_kernel("julia", "c_real", "c_imag")
+def julia(c_real: float, c_imag: float):
+    c_real = np.float32(c_real)
+    c_imag = np.float32(c_imag)
+
+    @numba.njit(fastmath=True)
+    def compute_pixel(x, y, max_iters):
+        real = x
+        imag = y
+        for iteration in range(max_iters):
+            real_sq = real * real
+            imag_sq = imag * imag
+            if real_sq + imag_sq > ESCAPE_RADIUS_SQ:
+                return shade(iteration, max_iters)
+            imag = 2.0 * real * imag + c_imag
+            real = real_sq - imag_sq + c_real
+        return 0
+
+    return make_generate(compute_pixel)
+
+
+@register_kernel("burning_ship")
+def burning_ship():
+    @numba.njit(fastmath=True)
+    def compute_pixel(x, y, max_iters):
+        real = np.float32(0.0)
+        imag = np.float32(0.0)
+        for iteration in range(max_iters):
+            real_sq = real * real
+            imag_sq = imag * imag
+            if real_sq + imag_sq > ESCAPE_RADIUS_SQ:
+                return shade(iteration, max_iters)
+            imag = 2.0 * abs(real * imag) + y
+            real = real_sq - imag_sq + x
+        return 0
+
+    return make_generate(compute_pixel)
+
+
+DEFAULT_KERNELS = [
+    KernelVariant.of("mandelbrot"),
+    KernelVariant.of("multibrot", power=3),
+    KernelVariant.of("multibrot", power=4),
+    KernelVariant.of("julia", c_real=-0.8, c_imag=0.156),
+    KernelVariant.of("burning_ship"),
+]
@@ -1,15 +1,20 @@
 import logging
-from typing import Callable
+from multiprocessing import shared_memory
 import numpy as np
 from contextlib import contextmanager
 
-from shared_memory import SharedMemory
+from shared_memory import MAX_JOBS, SharedMemory
 from worker import WorkerManager
 from controls import Controls
+from kernels import KernelVariant, warm_up
+from buddhabrot import RenderMode, warm_up_orbit_density
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# How long render_frame()/render_jobs() wait for the workers before giving up
+FRAME_TIMEOUT = 30.0
+
 
 class MandelbrotVisualizer:
     def __init__(
@@ -19,17 +24,34 @@ class MandelbrotVisualizer:
         number_of_workers: int,
         max_iters: int,
         controls: Controls,
-        worker_function: Callable,
+        kernels: list[KernelVariant],
+        max_width: int | None = None,
+        max_height: int | None = None,
+        output_memory: shared_memory.SharedMemory | None = None,
     ):
         self.screen_width = screen_width
         self.number_of_workers = number_of_workers
         self.screen_height = screen_height
         self.has_switched_workers = True
+        # Frames can later be resized up to max_width x max_height without
+        # reallocating shared memory or restarting the workers
         self.shared_memory = SharedMemory(
-            self.screen_width, self.screen_height, max_iters
+            self.screen_width,
+            self.screen_height,
+            max_iters,
+            number_of_workers,
+            max_width,
+            max_height,
         )
+        self.has_stale_frame = False
+        # Where render_jobs() writes to. Workers are forked, so it has to
+        # exist before they are
+        self.output_memory = output_memory
         self.controls = controls
-        self.worker_function = worker_function
+        self.kernels = kernels
+        self.orbit_view = None
+        warm_up(self.kernels, strided=output_memory is not None)
+        warm_up_orbit_density()
         self.worker_manager = WorkerManager(self)
         self.worker_manager.initialize_workers()
 
@@ -37,9 +59,22 @@ class MandelbrotVisualizer:
         if self.worker_manager.syncer and not self.worker_manager.syncer.is_busy:
             self.worker_manager.initialize_workers()
 
+            # Workers pick up the new size at the start of their next frame
+            if self.worker_manager.syncer.is_done and self.controls.screen_width:
+                size = (
+                    min(self.controls.screen_width, self.shared_memory.max_width),
+                    min(self.controls.screen_height, self.shared_memory.max_height),
+                )
+                if size != (self.screen_width, self.screen_height):
+                    self._resize(*size)
+
             if self.shared_memory.max_iters.value != self.controls.max_iters:
                 self.shared_memory.max_iters.value = self.controls.max_iters
 
+            self.controls.kernel_index %= len(self.kernels)
+            if self.shared_memory.kernel_index.value != self.controls.kernel_index:
+                self.shared_memory.kernel_index.value = self.controls.kernel_index
+
             zoomX = self.controls.zoom + self.controls.zoom * (
                 self.screen_height / self.screen_width
             )
@@ -54,28 +89,122 @@ class MandelbrotVisualizer:
                 self.screen_height,
             )
 
+            # Orbit densities keep refining until anything they depend on changes
+            orbit_view = (
+                self.controls.centerX,
+                self.controls.centerY,
+                self.controls.zoom,
+                self.controls.max_iters,
+                self.controls.importance_sampling,
+            )
+            if self.orbit_view != orbit_view:
+                self.orbit_view = orbit_view
+                self.shared_memory.importance_sampling.value = (
+                    self.controls.importance_sampling
+                )
+                self.shared_memory.view_version.value += 1
+
+            # Workers branch on the render mode between barriers, so it may only
+            # change while they are all parked at the end of a frame
+            if (
+                self.worker_manager.syncer.is_done
+                and self.shared_memory.render_mode.value != self.controls.render_mode
+            ):
+                self.shared_memory.render_mode.value = self.controls.render_mode
+                self.shared_memory.view_version.value += 1
+
+    def _resize(self, width: int, height: int):
+        logger.debug(f"Resizing frames to {width}x{height}.")
+        self.shared_memory.resize(width, height)
+        self.screen_width = width
+        self.screen_height = height
+        self.shared_memory.view_version.value += 1
+        # The last frame was laid out for the old size
+        self.has_stale_frame = True
+
     @contextmanager
-    def get_pixels(self):
+    def get_pixels(self, placeholder: bool = True):
+        """
+        Yield the latest frame, or None if there's no new one. While new
+        workers start up, yields a blank frame unless `placeholder` is False.
+        """
         pixels = None
         continue_workers = False
         try:
             if self.worker_manager.syncer:
-                if not self.worker_manager.has_initialized:
+                if placeholder and not self.worker_manager.has_initialized:
                     pixels = np.zeros(
                         (self.screen_width, self.screen_height), dtype=np.uint32
                     )
                 if self.worker_manager.syncer.is_done:
-                    pixels = self.shared_memory.pixels_a
+                    if self.has_stale_frame:
+                        self.has_stale_frame = False
+                    else:
+                        pixels = self.shared_memory.pixels_a
                     continue_workers = True
             yield pixels
         finally:
             if continue_workers and self.worker_manager.syncer:
                 self.worker_manager.syncer.continue_workers()
 
+    def render_frame(
+        self,
+        cx: np.ndarray,
+        cy: np.ndarray,
+        max_iters: int,
+        kernel_index: int = 0,
+        timeout: float | None = FRAME_TIMEOUT,
+    ) -> np.ndarray:
+        """
+        Render a single frame for explicit coordinates and block until it is
+        done. The returned pixels are a view of shared memory that is only
+        valid until the next frame. Not to be mixed with update()/get_pixels().
+        Raises TimeoutError if the workers take longer than `timeout`.
+        """
+        width, height = len(cx), len(cy)
+        syncer = self.worker_manager.syncer
+        # Workers park after every frame until they are continued
+        self._wait_until_done(timeout)
+        if (width, height) != (self.screen_width, self.screen_height):
+            # Raises ValueError if the frame doesn't fit in shared memory
+            self._resize(width, height)
+        self.shared_memory.cx_a[:] = cx
+        self.shared_memory.cy_a[:] = cy
+        self.shared_memory.max_iters.value = max_iters
+        self.shared_memory.kernel_index.value = kernel_index
+        self.shared_memory.job_count.value = 0
+        syncer.continue_workers()
+        self._wait_until_done(timeout)
+        return self.shared_memory.pixels_a
+
+    def render_jobs(self, jobs: list[tuple], timeout: float | None = FRAME_TIMEOUT):
+        """
+        Render a batch of chunks straight into `output_memory` in a single
+        frame and block until they are done. Each job is a tuple of
+        `shared_memory.JOB` fields. Not to be mixed with update()/get_pixels().
+        Raises TimeoutError if the workers take longer than `timeout`.
+        """
+        if not 0 < len(jobs) <= MAX_JOBS:
+            raise ValueError(f"A batch holds 1 to {MAX_JOBS} jobs, got {len(jobs)}")
+        syncer = self.worker_manager.syncer
+        self._wait_until_done(timeout)
+        self.shared_memory.jobs[: len(jobs)] = jobs
+        self.shared_memory.job_count.value = len(jobs)
+        syncer.continue_workers()
+        self._wait_until_done(timeout)
+
+    def _wait_until_done(self, timeout: float | None):
+        if not self.worker_manager.syncer.wait_until_done(timeout):
+            raise TimeoutError(f"Workers didn't finish a frame within {timeout}s")
+
     def get_texts(self):
         return [
             f"{self.controls.worker_type} (press c to change)",
             f"Iters: {self.shared_memory.max_iters.value} (press right/left arrow to change)",
+            f"Kernel: {self.kernels[self.shared_memory.kernel_index.value].label} (press k to change)",
+            f"Mode: {RenderMode(self.shared_memory.render_mode.value).name.lower()}"
+            f"{', importance sampling' if self.shared_memory.importance_sampling.value else ''}"
+            " (press b to change, i to toggle importance sampling)",
         ]
 
     def terminate(self):
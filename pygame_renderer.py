@@ -12,22 +12,34 @@ class PygameRenderer(Renderer):
         pg.display.set_caption("Mandelbrot Python Visualizer")
         info = pg.display.Info()
         screen_ratio = info.current_h / info.current_w
+        # The window can be resized up to the size of the display
+        self.max_width = info.current_w
+        self.max_height = info.current_h
         self.screen_width = int(info.current_w // 1.3)
         self.screen_height = int(screen_ratio * self.screen_width)
-        self.screen = pg.display.set_mode((self.screen_width, self.screen_height))
+        self.screen = pg.display.set_mode(
+            (self.screen_width, self.screen_height), pg.RESIZABLE
+        )
+        self._create_surfaces()
+        self.controls.resize(self.screen_width, self.screen_height)
+        self.clock = pg.time.Clock()
+        self.font = pg.font.Font(None, 25)
+
+    def _create_surfaces(self):
         self.mandelbrot_surface = pg.Surface(
             (self.screen.get_width(), self.screen.get_height())
         )
         self.text_surface = pg.Surface(
             (self.screen.get_width(), self.screen.get_height()), pg.SRCALPHA
         )
-        self.clock = pg.time.Clock()
-        self.font = pg.font.Font(None, 25)
 
     def render_pixels(self, pixels: np.ndarray | None):
         if pixels is not None:
             pixels_r = pg.surfarray.pixels2d(self.mandelbrot_surface)
-            pixels_r[:] = pixels
+            # Frames can lag a resize by one frame
+            w = min(pixels.shape[0], pixels_r.shape[0])
+            h = min(pixels.shape[1], pixels_r.shape[1])
+            pixels_r[:w, :h] = pixels[:w, :h]
 
     def _text_drop_shadow(self, message, offset):
         text_color = 255, 255, 255
@@ -89,9 +101,19 @@ class PygameRenderer(Renderer):
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.controls.quit = True
+            elif event.type == pg.VIDEORESIZE:
+                self.screen_width, self.screen_height = event.w, event.h
+                self._create_surfaces()
+                self.controls.resize(event.w, event.h)
             elif event.type == pg.KEYDOWN:
                 if event.key == pg.K_c:
                     self.controls.switch_worker()
+                elif event.key == pg.K_k:
+                    self.controls.next_kernel()
+                elif event.key == pg.K_b:
+                    self.controls.next_render_mode()
+                elif event.key == pg.K_i:
+                    self.controls.toggle_importance_sampling()
             elif event.type == pg.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     self.controls.start_pan(event.pos[0], event.pos[1])
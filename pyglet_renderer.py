@@ -11,21 +11,20 @@ class PygletRenderer(Renderer):
         display = pyglet.canvas.get_display()
         screen = display.get_default_screen()
         screen_ratio = screen.height / screen.width
+        # The window can be resized up to the size of the screen
+        self.max_width = screen.width
+        self.max_height = screen.height
         self.screen_width = int(screen.width // 1.3)
         self.screen_height = int(screen_ratio * self.screen_width)
         self.window = pyglet.window.Window(
             width=self.screen_width,
             height=self.screen_height,
             caption="Mandelbrot Python Visualizer",
-            resizable=False,
-        )
-        self.image = pyglet.image.ImageData(
-            self.screen_width,
-            self.screen_height,
-            "RGBA",
-            pitch=self.screen_width * 4,
-            data=None,
+            resizable=True,
         )
+        self.window.set_maximum_size(self.max_width, self.max_height)
+        self.image = None
+        self.controls.resize(self.screen_width, self.screen_height)
 
         self.batch = pyglet.graphics.Batch()
         self.labels = []
@@ -38,7 +37,7 @@ class PygletRenderer(Renderer):
         self.quit_flag = False
         self.labels = []
 
-        for _ in range(2):
+        for _ in range(4):
             self.labels.append(
                 pyglet.text.Label(
                     "",
@@ -63,7 +62,11 @@ class PygletRenderer(Renderer):
             colored_pixels = np.stack((red, green, blue, alpha), axis=-1)
             colored_pixels = np.transpose(colored_pixels, (1, 0, 2))
 
-            self.image.set_data("RGBA", self.screen_width * 4, colored_pixels.tobytes())
+            width, height = pixels.shape
+            # Frames can lag a resize by one frame, so size the image by the frame
+            self.image = pyglet.image.ImageData(
+                width, height, "RGBA", colored_pixels.tobytes(), pitch=width * 4
+            )
 
     def _render_text(self, idx, text: str, x: int, y: int):
         self.labels[idx].text = text
@@ -104,12 +107,24 @@ class PygletRenderer(Renderer):
 
     def on_draw(self):
         self.window.clear()
-        self.image.blit(0, 0)
+        if self.image is not None:
+            self.image.blit(0, 0)
         self.batch.draw()
 
     def on_key_press(self, symbol, modifiers):
         if symbol == pyglet.window.key.C:
             self.controls.switch_worker()
+        elif symbol == pyglet.window.key.K:
+            self.controls.next_kernel()
+        elif symbol == pyglet.window.key.B:
+            self.controls.next_render_mode()
+        elif symbol == pyglet.window.key.I:
+            self.controls.toggle_importance_sampling()
+
+    def on_resize(self, width, height):
+        self.screen_width, self.screen_height = width, height
+        self.controls.resize(width, height)
+        # Let the window's default handler update the viewport
 
     def on_mouse_press(self, x, y, button, modifiers):
         if button == pyglet.window.mouse.LEFT:
@@ -0,0 +1,398 @@
+import asyncio
+import bisect
+import collections
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from enum import Enum
+from multiprocessing import shared_memory
+import numpy as np
+
+from controls import Controls
+from kernels import KernelVariant
+from mandelbrot_visualizer import MandelbrotVisualizer
+from shared_memory import MAX_JOBS
+from worker import WorkerType
+
+
+class Output(Enum):
+    RGB = "rgb"
+    ITERATIONS = "iterations"
+
+
+# Indexed by the order of Output
+SERVICE_KERNELS = [
+    KernelVariant.of("mandelbrot"),
+    KernelVariant.of("mandelbrot_iterations"),
+]
+
+
+@dataclass(frozen=True)
+class View:
+    """
+    An explicit view of the complex plane. `span` is the width of the view
+    along the real axis; pixels are square. Row 0 holds the smallest
+    imaginary values, as in the visualizer.
+    """
+
+    center_x: float
+    center_y: float
+    span: float
+    width: int
+    height: int
+    max_iters: int = 80
+    output: Output = Output.RGB
+
+    def coordinates(self):
+        # Sample pixel centres
+        step = self.span / self.width
+        cx = self.center_x + (np.arange(self.width) - (self.width - 1) / 2) * step
+        cy = self.center_y + (np.arange(self.height) - (self.height - 1) / 2) * step
+        return cx, cy
+
+
+@dataclass(frozen=True)
+class ResultLayout:
+    """
+    Where a result lives, for other processes: attach to the arena by `name`
+    and rebuild the array with view(). `offset` is the byte offset of the
+    array's first element; RGB results have a negative channel stride.
+    """
+
+    name: str
+    offset: int
+    shape: tuple[int, ...]
+    strides: tuple[int, ...]
+    dtype: str
+
+    def view(self, buffer) -> np.ndarray:
+        return np.ndarray(
+            self.shape, np.dtype(self.dtype), buffer, self.offset, self.strides
+        )
+
+
+class ResultArena:
+    """
+    First-fit allocator over a single shared memory block. Allocated arrays
+    give their space back once they, and every view of them, are garbage
+    collected. After close() the block stays mapped until that has happened
+    to every array, since reading an unmapped array would crash.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, size: int):
+        self.size = size
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        # Sorted, non-adjacent (offset, size) blocks
+        self._free = [(0, size)]
+        self._lock = threading.Lock()
+        self._closed = False
+        self._address = np.ndarray((1,), np.uint8, self.memory.buf).ctypes.data
+
+    def allocate(self, shape: tuple, dtype) -> np.ndarray:
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        nbytes = max(self.ALIGNMENT, -(-nbytes // self.ALIGNMENT) * self.ALIGNMENT)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Result arena is closed")
+            for i, (offset, size) in enumerate(self._free):
+                if size >= nbytes:
+                    if size == nbytes:
+                        del self._free[i]
+                    else:
+                        self._free[i] = (offset + nbytes, size - nbytes)
+                    break
+            else:
+                raise MemoryError(
+                    f"No room for {nbytes} bytes in the {self.size} byte result arena"
+                )
+        array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+        weakref.finalize(array, self._release, offset, nbytes)
+        return array
+
+    def _release(self, offset: int, size: int):
+        with self._lock:
+            i = bisect.bisect(self._free, (offset, size))
+            # Merge with the following and preceding free blocks
+            if i < len(self._free) and offset + size == self._free[i][0]:
+                size += self._free.pop(i)[1]
+            if i > 0 and self._free[i - 1][0] + self._free[i - 1][1] == offset:
+                offset, previous = self._free[i - 1]
+                size += previous
+                i -= 1
+                del self._free[i]
+            self._free.insert(i, (offset, size))
+            self._unmap_if_unused()
+
+    def _unmap_if_unused(self):
+        if self._closed and self._free == [(0, self.size)]:
+            self.memory.close()
+
+    @property
+    def name(self) -> str:
+        """Name other processes can attach to the arena by."""
+        return self.memory.name
+
+    def offset(self, array: np.ndarray) -> int:
+        """Byte offset in the arena of the first element of an allocated
+        array, or of a view of one."""
+        return array.ctypes.data - self._address
+
+    def layout(self, array: np.ndarray) -> ResultLayout:
+        return ResultLayout(
+            self.name, self.offset(array), array.shape, array.strides, array.dtype.str
+        )
+
+    @property
+    def free_bytes(self):
+        with self._lock:
+            return sum(size for _, size in self._free)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.memory.unlink()
+            self._unmap_if_unused()
+
+
+class _Request:
+    """One render()/render_many() call, the unit the dispatcher is fair between."""
+
+    def __init__(self, loop, views, results, coordinates, deadline):
+        self.loop = loop
+        self.views = views
+        self.results = results
+        # Each view's cx followed by its cy, for the workers to read
+        self.coordinates = coordinates
+        self.futures = [loop.create_future() for _ in views]
+        self.remaining = [0] * len(views)
+        self.deadline = deadline
+        self.chunks = collections.deque()
+
+    def split(self, frame_width: int, frame_height: int):
+        for i, view in enumerate(self.views):
+            for y in range(0, view.height, frame_height):
+                for x in range(0, view.width, frame_width):
+                    self.chunks.append((i, x, y))
+                    self.remaining[i] += 1
+
+    def set_result(self, i: int):
+        self._resolve_soon(i, self.results[i], None)
+
+    def set_exception(self, i: int, exception: BaseException):
+        self._resolve_soon(i, None, exception)
+
+    def _resolve_soon(self, i: int, result, exception):
+        try:
+            self.loop.call_soon_threadsafe(
+                _resolve, self.futures[i], result, exception
+            )
+        except RuntimeError:
+            # The caller's loop has closed, so nobody is waiting any more
+            pass
+
+
+def _resolve(future: asyncio.Future, result, exception):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+class RenderService:
+    """
+    Asyncio front end to the worker pool. Views larger than a pool frame are
+    split into frame-sized chunks. The dispatcher fills each pool frame with
+    up to a frame's worth of chunks, taking one from each pending request in
+    turn so large renders can't starve small ones, and the workers write
+    them straight into the result arena.
+    """
+
+    def __init__(
+        self,
+        number_of_workers: int,
+        worker_type: WorkerType = WorkerType.PROCESS,
+        frame_width: int = 256,
+        frame_height: int = 256,
+        arena_size: int = 32 * 2**20,
+    ):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        # Created first so the forked workers can write into it
+        self.arena = ResultArena(arena_size)
+        self.viz = MandelbrotVisualizer(
+            screen_width=frame_width,
+            screen_height=frame_height,
+            number_of_workers=number_of_workers,
+            max_iters=80,
+            controls=Controls(worker_type),
+            kernels=SERVICE_KERNELS,
+            output_memory=self.arena.memory,
+        )
+        self._requests = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    async def render(self, view: View, timeout: float | None = None) -> np.ndarray:
+        """
+        Render a view. Returns an (height, width) uint32 array of iteration
+        counts or an (height, width, 3) uint8 RGB array, both backed by shared
+        memory without copying.
+        """
+        return (await self.render_many([view], timeout))[0]
+
+    async def render_many(
+        self, views: list[View], timeout: float | None = None
+    ) -> list[np.ndarray]:
+        """Submit several views at once; they share one turn in the scheduler."""
+        if not views:
+            return []
+        for view in views:
+            if min(view.width, view.height, view.span, view.max_iters) <= 0:
+                raise ValueError(
+                    f"{view} must have a positive size, span and max_iters"
+                )
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = [
+            self.arena.allocate((view.height, view.width), np.uint32) for view in views
+        ]
+        coordinates = []
+        for view in views:
+            coords = self.arena.allocate((view.width + view.height,), np.float64)
+            coords[: view.width], coords[view.width :] = view.coordinates()
+            coordinates.append(coords)
+        request = _Request(loop, views, results, coordinates, deadline)
+        request.split(self.frame_width, self.frame_height)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Render service is closed")
+            self._requests.append(request)
+            self._condition.notify()
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*request.futures), timeout)
+        except BaseException:
+            # The dispatcher skips chunks of cancelled views
+            for future in request.futures:
+                future.cancel()
+            raise
+
+        return [
+            result
+            if view.output == Output.ITERATIONS
+            # 0x00RRGGBB is stored little endian as B, G, R, 0
+            else result.view(np.uint8).reshape(view.height, view.width, 4)[..., 2::-1]
+            for view, result in zip(views, results)
+        ]
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                while not self._requests and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    break
+                batch = self._next_batch()
+
+            if batch:
+                self._render_batch(batch)
+            # Don't hold on to finished results while waiting for more work
+            del batch
+
+        # Fail whatever was still queued when the service closed
+        for request in self._requests:
+            for i in range(len(request.views)):
+                request.set_exception(i, RuntimeError("Render service is closed"))
+
+    def _next_batch(self) -> list[tuple]:
+        """
+        Take chunks from the pending requests in turn until no more fit in
+        one pool frame. Requests whose next chunk didn't fit go first in the
+        next batch. Called with the condition held.
+        """
+        pixels_left = self.frame_width * self.frame_height
+        batch = []
+        skipped = []
+        while self._requests and len(batch) < MAX_JOBS:
+            request = self._requests.popleft()
+            if not request.chunks:
+                continue
+            i, x, y = request.chunks[0]
+            view = request.views[i]
+            pixels = min(self.frame_width, view.width - x) * min(
+                self.frame_height, view.height - y
+            )
+            if batch and pixels > pixels_left:
+                skipped.append(request)
+                continue
+            request.chunks.popleft()
+            self._requests.append(request)
+
+            if request.futures[i].done():
+                continue
+            if request.deadline is not None and time.monotonic() > request.deadline:
+                request.set_exception(i, TimeoutError())
+                continue
+            pixels_left -= pixels
+            batch.append((request, i, x, y))
+        self._requests.extendleft(reversed(skipped))
+        return batch
+
+    def _render_batch(self, batch: list[tuple]):
+        jobs = []
+        rendered = []
+        for request, i, x, y in batch:
+            try:
+                jobs.append(self._job(request, i, x, y))
+                rendered.append((request, i))
+            except Exception as e:
+                # A malformed request fails its own views, never the dispatcher
+                request.chunks.clear()
+                for j in range(len(request.views)):
+                    request.set_exception(j, e)
+
+        try:
+            if jobs:
+                self.viz.render_jobs(jobs)
+        except Exception as e:
+            for request, i in rendered:
+                request.set_exception(i, e)
+            return
+
+        for request, i in rendered:
+            request.remaining[i] -= 1
+            if not request.remaining[i]:
+                request.set_result(i)
+
+    def _job(self, request: _Request, i: int, x: int, y: int) -> tuple:
+        view = request.views[i]
+        result = self.arena.offset(request.results[i])
+        coordinates = self.arena.offset(request.coordinates[i])
+        return (
+            result + (y * view.width + x) * 4,
+            view.width,
+            coordinates + x * 8,
+            coordinates + (view.width + y) * 8,
+            min(self.frame_width, view.width - x),
+            min(self.frame_height, view.height - y),
+            view.max_iters,
+            list(Output).index(view.output),
+        )
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        self.viz.terminate()
+        self.arena.close()
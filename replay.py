@@ -0,0 +1,79 @@
+import argparse
+import logging
+import multiprocessing as mp
+from controls import Controls
+from kernels import DEFAULT_KERNELS
+from input_trace import InputTrace
+from mandelbrot_visualizer import MandelbrotVisualizer
+from replay_renderer import ReplayRenderer
+from worker import WorkerType
+
+numba_logger = logging.getLogger("numba")
+numba_logger.setLevel(logging.WARNING)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded input trace and report interactive latency."
+    )
+    parser.add_argument("trace", help="trace file written by `app.py --record`")
+    parser.add_argument(
+        "--worker-type",
+        choices=[t.value for t in WorkerType],
+        default=WorkerType.PROCESS.value,
+    )
+    parser.add_argument("--workers", type=int, default=1 + mp.cpu_count() // 2)
+    parser.add_argument("--target-fps", type=float, default=60)
+    parser.add_argument(
+        "--kernel",
+        choices=[k.label for k in DEFAULT_KERNELS],
+        default=DEFAULT_KERNELS[0].label,
+    )
+    args = parser.parse_args()
+
+    trace = InputTrace.load(args.trace)
+    controls = Controls(WorkerType(args.worker_type))
+    controls.kernel_index = [k.label for k in DEFAULT_KERNELS].index(args.kernel)
+    renderer = ReplayRenderer(controls, trace, args.target_fps)
+
+    viz = MandelbrotVisualizer(
+        screen_width=renderer.screen_width,
+        screen_height=renderer.screen_height,
+        number_of_workers=args.workers,
+        max_iters=80,
+        controls=controls,
+        kernels=DEFAULT_KERNELS,
+        max_width=renderer.max_width,
+        max_height=renderer.max_height,
+    )
+
+    # Wait for the first frame from the workers so JIT compilation isn't
+    # counted.
+    started = False
+    while not started:
+        viz.update()
+        with viz.get_pixels(placeholder=False) as pixels:
+            started = pixels is not None
+
+    while not controls.quit:
+        renderer.handle_input()
+        viz.update()
+        renderer.render_texts(viz.get_texts())
+        # Only count frames the workers rendered, not the blank frames shown
+        # while a new pool starts after switch_worker
+        with viz.get_pixels(placeholder=False) as pixels:
+            renderer.render_pixels(pixels)
+        renderer.display()
+
+    viz.terminate()
+    renderer.quit()
+
+    for key, value in renderer.stats.report().items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import time
+import numpy as np
+
+from renderer import Renderer
+from controls import Controls
+from input_trace import InputTrace
+
+
+class LatencyStats:
+    """
+    Tracks input-to-display latency for the visualizer's frame pipeline.
+
+    Inputs applied before a frame is shown are written to shared memory by
+    `MandelbrotVisualizer.update()` and picked up by the workers once that
+    frame is released, so they become visible on the *next* shown frame.
+    """
+
+    def __init__(self, target_fps: float = 60):
+        self.frame_interval = 1 / target_fps
+        self.latencies = []
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self._pending = []
+        self._in_flight = []
+        self._last_frame_time = None
+        self._first_frame_time = None
+
+    def input_applied(self, t: float):
+        self._pending.append(t)
+
+    def frame_shown(self, t: float):
+        self.latencies.extend(t - applied for applied in self._in_flight)
+        self._in_flight = self._pending
+        self._pending = []
+
+        if self._last_frame_time is not None:
+            missed = round((t - self._last_frame_time) / self.frame_interval) - 1
+            self.frames_dropped += max(0, missed)
+        else:
+            self._first_frame_time = t
+        self._last_frame_time = t
+        self.frames_shown += 1
+
+    @property
+    def is_settled(self):
+        return not self._pending and not self._in_flight
+
+    @property
+    def fps(self):
+        if self.frames_shown < 2:
+            return 0.0
+        return (self.frames_shown - 1) / (self._last_frame_time - self._first_frame_time)
+
+    def report(self, percentiles=(50, 90, 99)):
+        report = {
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+            "fps": self.fps,
+        }
+        if self.latencies:
+            values = np.percentile(np.array(self.latencies) * 1000, percentiles)
+            for p, value in zip(percentiles, values):
+                report[f"latency_p{p}_ms"] = float(value)
+        return report
+
+
+class ReplayRenderer(Renderer):
+    """Headless renderer that plays an `InputTrace` back against `Controls`."""
+
+    def __init__(self, controls: Controls, trace: InputTrace, target_fps: float = 60):
+        super().__init__(controls)
+        self.trace = trace
+        self.screen_width = trace.screen_width
+        self.screen_height = trace.screen_height
+        # Leave room for every size the window was resized to
+        sizes = [(e.args[0], e.args[1]) for e in trace.events if e.action == "resize"]
+        self.max_width = max([self.screen_width] + [w for w, _ in sizes])
+        self.max_height = max([self.screen_height] + [h for _, h in sizes])
+        self.stats = LatencyStats(target_fps)
+        self._next_event = 0
+        self._start = None
+
+    def render_pixels(self, pixels: np.ndarray | None):
+        if pixels is not None:
+            self.stats.frame_shown(time.perf_counter())
+
+    def render_texts(self, texts: list[str]):
+        pass
+
+    def display(self):
+        pass
+
+    def handle_input(self):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        elapsed = now - self._start
+
+        events = self.trace.events
+        while self._next_event < len(events) and events[self._next_event].t <= elapsed:
+            event = events[self._next_event]
+            getattr(self.controls, event.action)(*event.args)
+            self.stats.input_applied(self._start + event.t)
+            self._next_event += 1
+
+        if self._next_event == len(events) and self.stats.is_settled:
+            self.controls.quit = True
+
+    def quit(self):
+        pass
@@ -1,39 +1,188 @@
 import multiprocessing as mp
 from multiprocessing import shared_memory
+from dataclasses import dataclass
 import numpy as np
 
+from buddhabrot import RenderMode
+
+ALIGNMENT = 64
+# Shared memory for the orbit density histograms and their sum. Frames with
+# more pixels than fit are accumulated at a lower resolution and upscaled.
+ORBIT_DENSITY_BYTES = 32 * 2**20
+
+# A chunk rendered by MandelbrotVisualizer.render_jobs(): byte offsets into
+# the output memory plus the chunk's size. Pixels are written in row-major
+# (height, width) order, with rows `stride` pixels apart.
+JOB = np.dtype(
+    [
+        ("pixels", np.int64),
+        ("stride", np.int64),
+        ("cx", np.int64),
+        ("cy", np.int64),
+        ("width", np.int64),
+        ("height", np.int64),
+        ("max_iters", np.int64),
+        ("kernel_index", np.int64),
+    ]
+)
+MAX_JOBS = 256
+
+
+@dataclass
+class FrameViews:
+    """Arrays for one frame size, all backed by the shared memory arena."""
+
+    version: int
+    cx: np.ndarray
+    cy: np.ndarray
+    pixels: np.ndarray
+    # Orbit density mode: one private histogram per worker plus the
+    # reduced density they are summed into, at most the frame's size
+    histograms: np.ndarray
+    density: np.ndarray
+
 
 class SharedMemory:
-    """Handles shared memory arrays and values."""
+    """
+    Handles shared memory arrays and values.
 
-    def __init__(self, screen_width: int, screen_height: int, max_iters: int):
-        self.screen_width = screen_width
-        self.screen_height = screen_height
+    All arrays live in one arena allocated for the largest frame, so the
+    frame size can change without allocating a new segment. The arena starts
+    with a header of (version, width, height, stride); whoever holds a
+    `FrameViews` re-attaches when the version moves on.
+    """
 
-        # Create shared memory blocks
-        self.cx = shared_memory.SharedMemory(
-            create=True, size=screen_width * np.float64().nbytes
-        )
-        self.cy = shared_memory.SharedMemory(
-            create=True, size=screen_height * np.float64().nbytes
-        )
-        self.pixels = shared_memory.SharedMemory(
-            create=True, size=screen_width * screen_height * np.uint32().nbytes
+    HEADER = np.dtype(np.int64).itemsize * 4
+
+    def __init__(
+        self,
+        screen_width: int,
+        screen_height: int,
+        max_iters: int,
+        number_of_workers: int,
+        max_width: int | None = None,
+        max_height: int | None = None,
+        orbit_density_bytes: int = ORBIT_DENSITY_BYTES,
+    ):
+        self.max_width = max_width or screen_width
+        self.max_height = max_height or screen_height
+        self.number_of_workers = number_of_workers
+
+        # Lay out every array at its largest size
+        capacity = self.max_width * self.max_height
+        self.orbit_capacity = min(
+            capacity, orbit_density_bytes // ((number_of_workers + 1) * 4)
         )
+        self._offsets = {}
+        size = self.HEADER
+        for name, nbytes in (
+            ("cx", self.max_width * np.float64().nbytes),
+            ("cy", self.max_height * np.float64().nbytes),
+            ("pixels", capacity * np.uint32().nbytes),
+            ("histograms", number_of_workers * self.orbit_capacity * 4),
+            ("density", self.orbit_capacity * 4),
+            ("jobs", MAX_JOBS * JOB.itemsize),
+        ):
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            self._offsets[name] = size
+            size += nbytes
 
-        # Create NumPy arrays backed by shared memory
-        self.cx_a = np.ndarray((screen_width,), dtype=np.float64, buffer=self.cx.buf)
-        self.cy_a = np.ndarray((screen_height,), dtype=np.float64, buffer=self.cy.buf)
-        self.pixels_a = np.ndarray(
-            (screen_width, screen_height), dtype=np.uint32, buffer=self.pixels.buf
+        self.arena = shared_memory.SharedMemory(create=True, size=size)
+        self.header = np.ndarray((4,), dtype=np.int64, buffer=self.arena.buf)
+        self.resize(screen_width, screen_height)
+        self.jobs = np.ndarray(
+            (MAX_JOBS,),
+            dtype=JOB,
+            buffer=self.arena.buf,
+            offset=self._offsets["jobs"],
         )
 
         self.max_iters = mp.Value("i", max_iters)
+        self.kernel_index = mp.Value("i", 0)
+        self.render_mode = mp.Value("i", RenderMode.ESCAPE_TIME)
+        self.importance_sampling = mp.Value("b", False)
+        # Bumped whenever the orbit density has to start over
+        self.view_version = mp.Value("i", 0)
+        self.density_peaks = mp.Array("d", number_of_workers)
+        # Non-zero while the workers render a batch of jobs instead of a frame
+        self.job_count = mp.Value("i", 0)
+
+    def resize(self, width: int, height: int):
+        """Change the frame size. Only safe while the workers are parked."""
+        if not (0 < width <= self.max_width and 0 < height <= self.max_height):
+            raise ValueError(
+                f"{width}x{height} frame doesn't fit in "
+                f"{self.max_width}x{self.max_height}"
+            )
+        self.header[1:] = width, height, height
+        self.header[0] += 1
+        self.frame = self.attach()
+
+    @property
+    def version(self) -> int:
+        return int(self.header[0])
+
+    def orbit_size(self, width: int, height: int) -> tuple[int, int]:
+        """Size of the orbit density histograms for a frame size."""
+        scale = min(1.0, (self.orbit_capacity / (width * height)) ** 0.5)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def attach(self) -> FrameViews:
+        version, width, height, stride = (int(v) for v in self.header)
+        orbit_width, orbit_height = self.orbit_size(width, height)
+
+        def view(name, shape, dtype, strides=None):
+            return np.ndarray(
+                shape,
+                dtype=dtype,
+                buffer=self.arena.buf,
+                offset=self._offsets[name],
+                strides=strides,
+            )
+
+        return FrameViews(
+            version=version,
+            cx=view("cx", (width,), np.float64),
+            cy=view("cy", (height,), np.float64),
+            pixels=view("pixels", (width, height), np.uint32, (stride * 4, 4)),
+            histograms=view(
+                "histograms",
+                (self.number_of_workers, orbit_width, orbit_height),
+                np.float32,
+            ),
+            density=view("density", (orbit_width, orbit_height), np.float32),
+        )
+
+    @property
+    def screen_width(self) -> int:
+        return len(self.frame.cx)
+
+    @property
+    def screen_height(self) -> int:
+        return len(self.frame.cy)
+
+    @property
+    def cx_a(self):
+        return self.frame.cx
+
+    @property
+    def cy_a(self):
+        return self.frame.cy
+
+    @property
+    def pixels_a(self):
+        return self.frame.pixels
+
+    @property
+    def histograms_a(self):
+        return self.frame.histograms
+
+    @property
+    def density_a(self):
+        return self.frame.density
 
     def clean_up_memory(self):
-        self.cx.close()
-        self.cx.unlink()
-        self.cy.close()
-        self.cy.unlink()
-        self.pixels.close()
-        self.pixels.unlink()
+        # The arena can't be closed while views of it are alive
+        self.frame = self.header = self.jobs = None
+        self.arena.close()
+        self.arena.unlink()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from buddhabrot import reduce_histograms, sample_orbits, shade_density
+
+
+class TestOrbitDensity(unittest.TestCase):
+    def test_reduce_histograms(self):
+        histograms = np.zeros((3, 4, 6), dtype=np.float32)
+        histograms[:, 1, 2] = [1, 2, 3]
+        histograms[0, 0, 5] = 10
+        density = np.full((4, 6), -1, dtype=np.float32)
+        peak = reduce_histograms(histograms, density, 0, 2)
+        self.assertEqual(peak, 6)
+        self.assertEqual(density[1, 2], 6)
+        self.assertEqual(density[:, :3].sum(), 6)
+        # Lines outside the range are left alone
+        self.assertTrue((density[:, 3:] == -1).all())
+
+    def test_shade_density(self):
+        density = np.array([[0, 1, 4]], dtype=np.float32)
+        pixels = np.zeros((1, 3), dtype=np.uint32)
+        shade_density(pixels, density, 4.0, 0, 2)
+        self.assertEqual(list(pixels[0] & 0xFF), [0, 127, 255])
+
+    def test_shade_density_upscales(self):
+        density = np.array([[1], [4]], dtype=np.float32)
+        pixels = np.zeros((4, 2), dtype=np.uint32)
+        shade_density(pixels, density, 4.0, 0, 1)
+        self.assertTrue((pixels[:2] & 0xFF == 127).all())
+        self.assertTrue((pixels[2:] & 0xFF == 255).all())
+
+    def test_sample_orbits_stays_in_view(self):
+        hist = np.zeros((40, 30), dtype=np.float32)
+        cx = np.linspace(-2, 2, 40)
+        cy = np.linspace(-2, 2, 30)
+        for importance in (False, True):
+            sample_orbits(hist, cx, cy, 50, 500, False, importance)
+        self.assertGreater(hist.sum(), 0)
+        self.assertTrue(np.isfinite(hist).all())
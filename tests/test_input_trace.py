@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from controls import Controls
+from input_trace import ControlsRecorder, InputEvent, InputTrace
+from worker import WorkerType
+
+
+class TestInputTrace(unittest.TestCase):
+    def test_save_and_load(self):
+        trace = InputTrace(
+            640,
+            480,
+            [InputEvent(0.0, "resize", (800, 600)), InputEvent(0.5, "zoomin", (10,))],
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            trace.save(path)
+            self.assertEqual(InputTrace.load(path), trace)
+        self.assertEqual(trace.duration, 0.5)
+
+
+class TestControlsRecorder(unittest.TestCase):
+    def setUp(self):
+        self.controls = Controls(WorkerType.PROCESS)
+        self.trace = InputTrace()
+        self.recorder = ControlsRecorder(self.controls, self.trace)
+
+    def test_actions_are_recorded_and_applied(self):
+        self.recorder.zoomin(10)
+        self.recorder.move_pan(3, 4, 100, 100)
+        self.assertEqual(
+            [(e.action, e.args) for e in self.trace.events],
+            [("zoomin", (10,)), ("move_pan", (3, 4, 100, 100))],
+        )
+        self.assertLess(self.controls.zoom, 2)
+
+    def test_attributes_pass_through_unrecorded(self):
+        self.recorder.quit = True
+        self.assertTrue(self.controls.quit)
+        self.assertEqual(self.recorder.max_iters, self.controls.max_iters)
+        self.assertEqual(self.trace.events, [])
+
+    @mock.patch("input_trace.time.perf_counter")
+    def test_timestamps_count_from_start(self, perf_counter):
+        perf_counter.return_value = 5.0
+        self.recorder.resize(800, 600)
+        self.recorder.start()
+        perf_counter.return_value = 7.5
+        self.recorder.zoomin()
+        self.assertEqual([e.t for e in self.trace.events], [0.0, 2.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from benchmark_kernels import BENCHMARK_KERNELS
+from kernels import ESCAPE_RADIUS_SQ, KERNELS, KernelVariant, compile_kernel
+
+
+def render(kernel: KernelVariant, cx, cy, max_iters):
+    pixels = np.zeros((len(cx), len(cy)), dtype=np.uint32)
+    kernel.function(pixels, cx, cy, max_iters, 0, len(cy) - 1)
+    return pixels
+
+
+class TestKernelRegistry(unittest.TestCase):
+    def test_variants_are_cached(self):
+        a = KernelVariant.of("multibrot", power=3)
+        b = KernelVariant.of("multibrot", power=3)
+        self.assertIs(a.function, b.function)
+        self.assertIsNot(a.function, KernelVariant.of("multibrot", power=4).function)
+
+    def test_label(self):
+        self.assertEqual(KernelVariant.of("mandelbrot").label, "mandelbrot")
+        self.assertEqual(
+            KernelVariant.of("julia", c_real=-0.8, c_imag=0.156).label,
+            "julia(c_imag=0.156, c_real=-0.8)",
+        )
+
+    def test_wrong_params(self):
+        with self.assertRaises(ValueError):
+            compile_kernel("julia", (("c_real", 0.0),))
+
+    def test_non_integer_power(self):
+        with self.assertRaises(ValueError):
+            KernelVariant.of("multibrot", power=2.5).function
+
+    def test_benchmark_covers_every_kernel(self):
+        self.assertEqual({kernel.name for kernel in BENCHMARK_KERNELS}, set(KERNELS))
+
+
+class TestKernelOutput(unittest.TestCase):
+    cx = np.linspace(-1.5, 1.5, 90)
+    cy = np.linspace(-1.5, 1.5, 70)
+
+    def test_multibrot_power_2_is_mandelbrot(self):
+        np.testing.assert_array_equal(
+            render(KernelVariant.of("multibrot", power=2), self.cx, self.cy, 60),
+            render(KernelVariant.of("mandelbrot"), self.cx, self.cy, 60),
+        )
+
+    def test_multibrot_power_3(self):
+        max_iters = 60
+        c = (self.cx[:, None] + 1j * self.cy[None, :]).astype(np.complex64)
+        z = np.zeros_like(c)
+        expected = np.zeros(c.shape, dtype=np.uint32)
+        alive = np.ones(c.shape, dtype=bool)
+        for iteration in range(max_iters):
+            escaped = alive & (z.real * z.real + z.imag * z.imag > ESCAPE_RADIUS_SQ)
+            color = 255 - int(255 * iteration / max_iters)
+            expected[escaped] = (color << 16) | (color << 8) | color
+            alive &= ~escaped
+            z = np.where(alive, z * z * z + c, z)
+        pixels = render(KernelVariant.of("multibrot", power=3), self.cx, self.cy, 60)
+        # float32 rounding may flip the odd pixel on the boundary of the set
+        self.assertLessEqual((pixels != expected).mean(), 0.001)
+        self.assertGreater(len(np.unique(pixels)), 10)
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from unittest import mock
+from controls import Controls
+from input_trace import InputEvent, InputTrace
+from replay_renderer import LatencyStats, ReplayRenderer
+from worker import WorkerType
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_input_shown_on_next_frame(self):
+        stats = LatencyStats(target_fps=10)
+        stats.frame_shown(0.0)
+        stats.input_applied(0.05)
+        stats.frame_shown(0.1)
+        self.assertEqual(stats.latencies, [])
+        self.assertFalse(stats.is_settled)
+        stats.frame_shown(0.2)
+        self.assertAlmostEqual(stats.latencies[0], 0.15)
+        self.assertTrue(stats.is_settled)
+
+    def test_dropped_frames(self):
+        stats = LatencyStats(target_fps=10)
+        stats.frame_shown(0.0)
+        stats.frame_shown(0.1)
+        stats.frame_shown(0.4)
+        self.assertEqual(stats.frames_shown, 3)
+        self.assertEqual(stats.frames_dropped, 2)
+        self.assertAlmostEqual(stats.fps, 5.0)
+
+    def test_report_percentiles(self):
+        stats = LatencyStats()
+        stats.latencies = [0.01, 0.02, 0.03]
+        report = stats.report(percentiles=(50,))
+        self.assertAlmostEqual(report["latency_p50_ms"], 20.0)
+
+
+@mock.patch("replay_renderer.time.perf_counter")
+class TestReplayRenderer(unittest.TestCase):
+    def setUp(self):
+        self.controls = Controls(WorkerType.PROCESS)
+        trace = InputTrace(
+            640,
+            480,
+            [
+                InputEvent(0.0, "resize", (800, 400)),
+                InputEvent(0.1, "zoomin", ()),
+                InputEvent(0.3, "resize", (600, 700)),
+            ],
+        )
+        self.renderer = ReplayRenderer(self.controls, trace, target_fps=10)
+
+    def test_size_covers_recorded_resizes(self, perf_counter):
+        renderer = self.renderer
+        self.assertEqual((renderer.screen_width, renderer.screen_height), (640, 480))
+        self.assertEqual((renderer.max_width, renderer.max_height), (800, 700))
+
+    def test_events_are_applied_by_time(self, perf_counter):
+        perf_counter.return_value = 10.0
+        self.renderer.handle_input()
+        self.assertEqual(self.controls.screen_width, 800)
+        self.assertEqual(self.controls.zoom, 2)
+        perf_counter.return_value = 10.2
+        self.renderer.handle_input()
+        self.assertLess(self.controls.zoom, 2)
+        self.assertEqual(self.controls.screen_width, 800)
+        self.assertEqual(self.renderer.stats._pending, [10.0, 10.1])
+
+    def test_quits_once_settled(self, perf_counter):
+        perf_counter.return_value = 10.0
+        self.renderer.handle_input()
+        perf_counter.return_value = 10.5
+        self.renderer.handle_input()
+        self.assertFalse(self.controls.quit)
+        # Inputs show up on the frame after the one they were applied before
+        self.renderer.render_pixels(np.zeros((1, 1)))
+        self.renderer.handle_input()
+        self.assertFalse(self.controls.quit)
+        perf_counter.return_value = 10.6
+        self.renderer.render_pixels(np.zeros((1, 1)))
+        self.renderer.handle_input()
+        self.assertTrue(self.controls.quit)
+        self.assertEqual(len(self.renderer.stats.latencies), 3)
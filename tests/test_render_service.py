@@ -0,0 +1,144 @@
+import asyncio
+import gc
+import unittest
+from unittest import mock
+from multiprocessing import shared_memory
+import numpy as np
+from kernels import KernelVariant
+from render_service import Output, RenderService, ResultArena, View
+
+
+class TestResultArena(unittest.TestCase):
+    def setUp(self):
+        self.arena = ResultArena(1024)
+
+    def tearDown(self):
+        gc.collect()
+        self.arena.close()
+
+    def test_allocations_do_not_overlap(self):
+        a = self.arena.allocate((4, 4), np.uint32)
+        b = self.arena.allocate((4, 4), np.uint32)
+        a[:] = 1
+        b[:] = 2
+        self.assertTrue((a == 1).all())
+        self.assertEqual(self.arena.free_bytes, 1024 - 128)
+
+    def test_space_is_returned_when_views_are_gone(self):
+        a = self.arena.allocate((16, 16), np.uint32)
+        view = a[2:]
+        del a
+        gc.collect()
+        self.assertEqual(self.arena.free_bytes, 0)
+        del view
+        gc.collect()
+        self.assertEqual(self.arena.free_bytes, 1024)
+
+    def test_free_blocks_are_merged(self):
+        arrays = [self.arena.allocate((64,), np.uint8) for _ in range(16)]
+        # Free every other block, then the rest
+        del arrays[::2]
+        gc.collect()
+        with self.assertRaises(MemoryError):
+            self.arena.allocate((128,), np.uint8)
+        arrays.clear()
+        gc.collect()
+        self.assertEqual(self.arena.allocate((1024,), np.uint8).nbytes, 1024)
+
+    def test_close_waits_for_allocations(self):
+        a = self.arena.allocate((16,), np.uint32)
+        a[:] = 3
+        self.arena.close()
+        self.assertEqual(a.sum(), 48)
+        self.assertIsNotNone(self.arena.memory.buf)
+        del a
+        gc.collect()
+        self.assertIsNone(self.arena.memory.buf)
+        with self.assertRaises(RuntimeError):
+            self.arena.allocate((16,), np.uint32)
+
+    def test_out_of_space(self):
+        with self.assertRaises(MemoryError):
+            self.arena.allocate((2048,), np.uint8)
+
+
+class TestView(unittest.TestCase):
+    def test_coordinates_are_pixel_centres(self):
+        cx, cy = View(0.0, 1.0, 4.0, 4, 2).coordinates()
+        np.testing.assert_allclose(cx, [-1.5, -0.5, 0.5, 1.5])
+        np.testing.assert_allclose(cy, [0.5, 1.5])
+
+
+class TestRenderService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = RenderService(
+            2, frame_width=32, frame_height=32, arena_size=2**20
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+
+    def render_many(self, views):
+        return asyncio.run(self.service.render_many(views, timeout=10))
+
+    def test_empty_batch(self):
+        self.assertEqual(self.render_many([]), [])
+        self.assertTrue(self.service._dispatcher.is_alive())
+
+    def test_invalid_views_are_rejected(self):
+        free_bytes = self.service.arena.free_bytes
+        for view in (
+            View(0.0, 0.0, 1.0, 0, 8),
+            View(0.0, 0.0, 1.0, 8, -1),
+            View(0.0, 0.0, 0.0, 8, 8),
+            View(0.0, 0.0, 1.0, 8, 8, max_iters=0),
+        ):
+            with self.assertRaises(ValueError):
+                self.render_many([View(0.0, 0.0, 1.0, 8, 8), view])
+        self.assertEqual(self.service.arena.free_bytes, free_bytes)
+        (pixels,) = self.render_many([View(0.0, 0.0, 1.0, 8, 8)])
+        self.assertEqual(pixels.shape, (8, 8, 3))
+
+    def test_render_after_a_timed_out_render(self):
+        # Still being rendered when asyncio.run() closes the loop
+        slow = View(-0.5, 0.0, 3.0, 32, 32, max_iters=200_000)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(self.service.render(slow, timeout=0.05))
+        (pixels,) = self.render_many([View(0.0, 0.0, 1.0, 8, 8)])
+        self.assertEqual(pixels.shape, (8, 8, 3))
+        self.assertTrue(self.service._dispatcher.is_alive())
+
+    def test_results_match_the_kernel(self):
+        # Larger than a pool frame in both directions, so it is split
+        view = View(-0.5, 0.1, 3.0, 70, 40, 60, Output.ITERATIONS)
+        (iterations,) = self.render_many([view])
+        expected = np.zeros((70, 40), dtype=np.uint32)
+        cx, cy = view.coordinates()
+        KernelVariant.of("mandelbrot_iterations").function(expected, cx, cy, 60, 0, 39)
+        np.testing.assert_array_equal(iterations, expected.T)
+        # Rendered in place in the arena
+        offset = self.service.arena.offset(iterations)
+        self.assertTrue(0 <= offset < self.service.arena.size)
+
+    def test_results_can_be_attached_by_name(self):
+        for output in Output:
+            (result,) = self.render_many([View(-0.5, 0.0, 3.0, 12, 10, output=output)])
+            layout = self.service.arena.layout(result)
+            memory = shared_memory.SharedMemory(name=layout.name)
+            try:
+                attached = layout.view(memory.buf)
+                np.testing.assert_array_equal(attached, result)
+                self.assertFalse(np.shares_memory(attached, result))
+                del attached
+            finally:
+                memory.close()
+
+    def test_small_views_share_a_frame(self):
+        viz = self.service.viz
+        with mock.patch.object(viz, "render_jobs", wraps=viz.render_jobs) as render:
+            results = self.render_many([View(0.0, 0.0, 1.0, 8, 8)] * 10)
+        render.assert_called_once()
+        self.assertEqual(len(render.call_args.args[0]), 10)
+        self.assertEqual(len(results), 10)
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from shared_memory import SharedMemory
+
+
+class TestSharedMemory(unittest.TestCase):
+    def setUp(self):
+        self.shared_memory = SharedMemory(8, 6, 80, 2, max_width=16, max_height=12)
+
+    def tearDown(self):
+        self.shared_memory.clean_up_memory()
+
+    def test_resize_bumps_version_and_attaches(self):
+        version = self.shared_memory.version
+        self.shared_memory.resize(12, 4)
+        self.assertEqual(self.shared_memory.version, version + 1)
+        frame = self.shared_memory.attach()
+        self.assertEqual(frame.version, version + 1)
+        self.assertEqual(frame.pixels.shape, (12, 4))
+        self.assertEqual(frame.histograms.shape, (2, 12, 4))
+        self.assertEqual(
+            (self.shared_memory.screen_width, self.shared_memory.screen_height), (12, 4)
+        )
+
+    def test_frames_are_contiguous(self):
+        self.shared_memory.resize(5, 3)
+        frame = self.shared_memory.frame
+        for array in (frame.pixels, frame.histograms, frame.histograms[1], frame.density):
+            self.assertTrue(array.flags.c_contiguous)
+
+    def test_views_share_the_arena(self):
+        self.shared_memory.resize(4, 4)
+        attached = self.shared_memory.attach()
+        self.shared_memory.pixels_a[:] = 7
+        self.assertTrue((attached.pixels == 7).all())
+        arrays = [attached.cx, attached.cy, attached.pixels, attached.density]
+        for i, a in enumerate(arrays):
+            for b in arrays[i + 1 :]:
+                self.assertFalse(np.shares_memory(a, b))
+
+    def test_orbit_density_fits_its_budget(self):
+        self.assertEqual(self.shared_memory.frame.density.shape, (8, 6))
+        # Room for 16 pixels in each of the 2 histograms and the density
+        shared_memory = SharedMemory(16, 12, 80, 2, orbit_density_bytes=3 * 16 * 4)
+        try:
+            self.assertEqual(shared_memory.frame.histograms.shape, (2, 4, 3))
+            self.assertEqual(shared_memory.frame.density.shape, (4, 3))
+            shared_memory.resize(4, 4)
+            self.assertEqual(shared_memory.frame.density.shape, (4, 4))
+        finally:
+            shared_memory.clean_up_memory()
+
+    def test_resize_beyond_capacity_raises(self):
+        version = self.shared_memory.version
+        for size in ((17, 4), (4, 13), (0, 4)):
+            with self.assertRaises(ValueError):
+                self.shared_memory.resize(*size)
+        self.assertEqual(self.shared_memory.version, version)
+
+
+if __name__ == "__main__":
+    unittest.main()
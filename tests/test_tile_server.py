@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+import zlib
+import numpy as np
+from tile_server import (
+    TileCache,
+    TileRequestHandler,
+    TileServer,
+    encode_png,
+    tile_bounds,
+)
+
+
+class TestTileBounds(unittest.TestCase):
+    def test_zoom_zero_covers_world(self):
+        self.assertEqual(tile_bounds(0, 0, 0), (-2.0, 2.0, -2.0, 2.0))
+
+    def test_rows_count_down_from_top(self):
+        self.assertEqual(tile_bounds(1, 0, 0), (-2.0, 0.0, 0.0, 2.0))
+        self.assertEqual(tile_bounds(1, 1, 1), (0.0, 2.0, -2.0, 0.0))
+
+    def test_children_tile_parent(self):
+        real_min, real_max, imag_min, imag_max = tile_bounds(3, 5, 2)
+        child = tile_bounds(4, 11, 5)
+        self.assertEqual(child[1], real_max)
+        self.assertEqual(child[3], imag_max - (imag_max - imag_min) / 2)
+
+
+class TestEncodePng(unittest.TestCase):
+    def test_scanlines(self):
+        pixels = np.array([[0xFF0000, 0x0000FF], [0x00FF00, 0xFFFFFF]], dtype=np.uint32)
+        png = encode_png(pixels)
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        start = png.index(b"IDAT") + 4
+        raw = zlib.decompress(png[start:])
+        # Row 0 holds x = 0 and x = 1 at y = 0
+        self.assertEqual(raw, b"\x00\xff\x00\x00\x00\xff\x00" b"\x00\x00\x00\xff\xff\xff\xff")
+
+
+class TestTileCache(unittest.TestCase):
+    def test_concurrent_requests_are_coalesced(self):
+        renders = []
+
+        def render(key):
+            renders.append(key)
+            time.sleep(0.1)
+            return repr(key).encode()
+
+        cache = TileCache(render)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get((1, 0, 0))))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(renders, [(1, 0, 0)])
+        self.assertEqual(results, [b"(1, 0, 0)"] * 8)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.coalesced, 7)
+
+    def test_lru_eviction(self):
+        cache = TileCache(lambda key: b"tile", max_tiles=2)
+        cache.get((0, 0, 0))
+        cache.get((1, 0, 0))
+        cache.get((0, 0, 0))
+        cache.get((1, 1, 0))
+        cache.get((0, 0, 0))
+        self.assertEqual(cache.hits, 2)
+        cache.get((1, 0, 0))
+        self.assertEqual(cache.misses, 4)
+
+    def test_failed_render_is_not_cached(self):
+        calls = []
+
+        def render(key):
+            calls.append(key)
+            raise RuntimeError("boom")
+
+        cache = TileCache(render)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                cache.get((0, 0, 0))
+        self.assertEqual(len(calls), 2)
+
+
+class TestTileRequestHandler(unittest.TestCase):
+    def test_failed_render_is_a_server_error(self):
+        def render(key):
+            raise TimeoutError("workers are gone")
+
+        handler = type("Handler", (TileRequestHandler,), {"cache": TileCache(render)})
+        server = TileServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/0/0/0.png"
+            with self.assertLogs("tile_server", "ERROR"):
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    urllib.request.urlopen(url)
+            self.assertEqual(error.exception.code, 500)
+        finally:
+            server.shutdown()
+            server.server_close()
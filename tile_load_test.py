@@ -0,0 +1,78 @@
+import argparse
+import functools
+import logging
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def random_tiles(count: int, max_zoom: int, duplicate_rate: float, seed: int):
+    """
+    Pick tiles at random zoom levels. A share of them repeats an earlier
+    tile, like neighbouring map viewers asking for the same area.
+    """
+    rng = random.Random(seed)
+    tiles = []
+    for _ in range(count):
+        if tiles and rng.random() < duplicate_rate:
+            tiles.append(rng.choice(tiles))
+            continue
+        z = rng.randint(0, max_zoom)
+        tiles.append((z, rng.randrange(2**z), rng.randrange(2**z)))
+    return tiles
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def fetch(url: str, timeout: float):
+    """Return the request's latency, or None if it failed."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+    except OSError as e:
+        # HTTP errors, timeouts and dropped connections
+        logger.debug(f"{url}: {e}")
+        return None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the tile server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-zoom", type=int, default=8)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    tiles = random_tiles(args.requests, args.max_zoom, args.duplicate_rate, args.seed)
+    urls = [f"{args.url}/{z}/{x}/{y}.png" for z, x, y in tiles]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        results = list(
+            executor.map(functools.partial(fetch, timeout=args.timeout), urls)
+        )
+    elapsed = time.perf_counter() - start
+
+    # Throughput and latency only count the requests that succeeded
+    latencies = [latency for latency in results if latency is not None]
+    print(f"requests: {len(urls)}")
+    print(f"errors: {len(urls) - len(latencies)}")
+    print(f"tiles/s: {len(latencies) / elapsed:.2f}")
+    if latencies:
+        p50, p90, p99 = np.percentile(np.array(latencies) * 1000, (50, 90, 99))
+        print(f"latency_p50_ms: {p50:.2f}")
+        print(f"latency_p90_ms: {p90:.2f}")
+        print(f"latency_p99_ms: {p99:.2f}")
+
+
+if __name__ == "__main__":
+    main()
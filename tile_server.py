@@ -0,0 +1,225 @@
+import argparse
+import logging
+import multiprocessing as mp
+import re
+import signal
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from controls import Controls
+from kernels import KernelVariant
+from mandelbrot_visualizer import MandelbrotVisualizer
+from worker import WorkerType
+
+numba_logger = logging.getLogger("numba")
+numba_logger.setLevel(logging.WARNING)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+# Zoom level 0 is a single tile covering this square of the complex plane
+WORLD_MIN = -2.0
+WORLD_SIZE = 4.0
+# Beyond this, pixel spacing drops below float64 resolution
+MAX_ZOOM = 40
+
+TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)\.png$")
+
+
+def tile_bounds(z: int, x: int, y: int):
+    """
+    Map XYZ tile coordinates to (real_min, real_max, imag_min, imag_max).
+    Tile rows count downwards from the top, so y = 0 holds the largest
+    imaginary values.
+    """
+    size = WORLD_SIZE / 2**z
+    real_min = WORLD_MIN + x * size
+    imag_max = WORLD_MIN + WORLD_SIZE - y * size
+    return real_min, real_min + size, imag_max - size, imag_max
+
+
+def encode_png(pixels: np.ndarray) -> bytes:
+    """Encode packed 0xRRGGBB pixels indexed [x, y] as an RGB PNG."""
+    pixels = pixels.T
+    height, width = pixels.shape
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[..., 0] = pixels >> 16
+    rgb[..., 1] = pixels >> 8
+    rgb[..., 2] = pixels
+    # Every scanline starts with filter type 0
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class TileRenderer:
+    """Renders tiles one at a time, each split across the whole worker pool."""
+
+    def __init__(self, number_of_workers: int, max_iters: int, worker_type: WorkerType):
+        self.viz = MandelbrotVisualizer(
+            screen_width=TILE_SIZE,
+            screen_height=TILE_SIZE,
+            number_of_workers=number_of_workers,
+            max_iters=max_iters,
+            controls=Controls(worker_type),
+            kernels=[KernelVariant.of("mandelbrot")],
+        )
+        self.max_iters = max_iters
+        self._lock = threading.Lock()
+
+    def render(self, z: int, x: int, y: int) -> np.ndarray:
+        real_min, real_max, imag_min, imag_max = tile_bounds(z, x, y)
+        step = (real_max - real_min) / TILE_SIZE
+        # Sample pixel centres so neighbouring tiles don't share an edge
+        offsets = (np.arange(TILE_SIZE) + 0.5) * step
+
+        with self._lock:
+            return self.viz.render_frame(
+                real_min + offsets, imag_max - offsets, self.max_iters
+            ).copy()
+
+    def terminate(self):
+        self.viz.terminate()
+
+
+class TileCache:
+    """
+    LRU cache of encoded tiles. Concurrent requests for a tile that is
+    still being rendered wait for that render instead of starting another.
+    """
+
+    def __init__(self, render, max_tiles: int = 4096):
+        self._render = render
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._in_flight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: tuple) -> bytes:
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return self._tiles[key]
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not is_owner:
+            return future.result()
+
+        try:
+            tile = self._render(key)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(tile)
+        return tile
+
+
+class TileRequestHandler(BaseHTTPRequestHandler):
+    cache: TileCache
+
+    def do_GET(self):
+        match = TILE_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return
+        z, x, y = map(int, match.groups())
+        if z > MAX_ZOOM or x >= 2**z or y >= 2**z:
+            self.send_error(404)
+            return
+
+        try:
+            tile = self.cache.get((z, x, y))
+        except Exception:
+            logger.exception(f"Failed to render tile {z}/{x}/{y}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(tile)))
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(tile)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class TileServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections under concurrent load
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Mandelbrot XYZ tiles.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--worker-type",
+        choices=[t.value for t in WorkerType],
+        default=WorkerType.PROCESS.value,
+    )
+    parser.add_argument("--workers", type=int, default=1 + mp.cpu_count() // 2)
+    parser.add_argument("--max-iters", type=int, default=200)
+    parser.add_argument("--cache-tiles", type=int, default=4096)
+    args = parser.parse_args()
+
+    # Forked workers inherit the ignored SIGINT, so Ctrl-C only reaches the
+    # server, which then shuts them down cleanly
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    renderer = TileRenderer(args.workers, args.max_iters, WorkerType(args.worker_type))
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    TileRequestHandler.cache = TileCache(
+        lambda key: encode_png(renderer.render(*key)), args.cache_tiles
+    )
+    server = TileServer((args.host, args.port), TileRequestHandler)
+    logger.info(f"Serving tiles on http://{args.host}:{args.port}/{{z}}/{{x}}/{{y}}.png")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        renderer.terminate()
+
+
+if __name__ == "__main__":
+    main()
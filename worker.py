@@ -1,13 +1,19 @@
 import logging
-import time
-import numpy as np
 import multiprocessing as mp
 import threading
+import numpy as np
 from enum import Enum
 from typing import Any
 from dataclasses import dataclass
 from contextlib import contextmanager
 from util import divide_into_ranges
+from buddhabrot import (
+    ORBIT_SAMPLES_PER_FRAME,
+    RenderMode,
+    reduce_histograms,
+    sample_orbits,
+    shade_density,
+)
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -23,28 +29,117 @@ class Worker:
     id: int
     viz: Any
     syncer: "WorkerSynchronizer"
+    view_version: int = -1
 
     def __call__(self):
-        pixels_a = np.ndarray(
-            (self.viz.shared_memory.screen_width, self.viz.shared_memory.screen_height),
-            dtype=np.uint32,
-            buffer=self.viz.shared_memory.pixels.buf,
-        )
+        try:
+            self.run()
+        except threading.BrokenBarrierError:
+            pass
+        finally:
+            # Release anyone who started a frame just before termination
+            self.syncer.abort()
 
-        ranges = divide_into_ranges(self.viz.screen_height, self.viz.number_of_workers)
+    def run(self):
+        shared_memory = self.viz.shared_memory
+        frame = None
         while not self.syncer.is_terminated:
             self.syncer.worker_before_hook()
-            # Perform computation
-            self.viz.worker_function(
-                pixels_a,
-                self.viz.shared_memory.cx_a,
-                self.viz.shared_memory.cy_a,
-                self.viz.shared_memory.max_iters.value,
-                ranges[self.id][0],
-                ranges[self.id][1],
-            )
+            # Re-attach to the arena whenever the frame size has changed
+            if frame is None or frame.version != shared_memory.version:
+                frame = shared_memory.attach()
+                ranges = divide_into_ranges(len(frame.cy), self.viz.number_of_workers)
+                orbit_ranges = divide_into_ranges(
+                    frame.density.shape[1], self.viz.number_of_workers
+                )
+
+            start_line, end_line = ranges[self.id]
+            job_count = shared_memory.job_count.value
+            mode = RenderMode(shared_memory.render_mode.value)
+            if job_count:
+                self.render_jobs(job_count)
+            elif mode == RenderMode.ESCAPE_TIME:
+                kernel = self.viz.kernels[shared_memory.kernel_index.value]
+                # Perform computation
+                kernel.function(
+                    frame.pixels,
+                    frame.cx,
+                    frame.cy,
+                    shared_memory.max_iters.value,
+                    start_line,
+                    end_line,
+                )
+            else:
+                self.render_orbit_density(
+                    frame, mode, start_line, end_line, *orbit_ranges[self.id]
+                )
             self.syncer.worker_after_hook()
 
+    def render_jobs(self, job_count):
+        buffer = self.viz.output_memory.buf
+        for job in self.viz.shared_memory.jobs[:job_count]:
+            width, height = int(job["width"]), int(job["height"])
+            start_line, end_line = divide_into_ranges(
+                height, self.viz.number_of_workers
+            )[self.id]
+            if start_line > end_line:
+                continue
+            # Indexed [x, y] like the screen buffer, but laid out in the
+            # row-major order of the result
+            pixels = np.ndarray(
+                (width, height),
+                dtype=np.uint32,
+                buffer=buffer,
+                offset=int(job["pixels"]),
+                strides=(4, int(job["stride"]) * 4),
+            )
+            cx = np.ndarray((width,), np.float64, buffer, int(job["cx"]))
+            cy = np.ndarray((height,), np.float64, buffer, int(job["cy"]))
+            self.viz.kernels[job["kernel_index"]].function(
+                pixels, cx, cy, int(job["max_iters"]), start_line, end_line
+            )
+
+    def render_orbit_density(
+        self, frame, mode, start_line, end_line, orbit_start_line, orbit_end_line
+    ):
+        shared_memory = self.viz.shared_memory
+        histogram = frame.histograms[self.id]
+        if self.view_version != shared_memory.view_version.value:
+            self.view_version = shared_memory.view_version.value
+            histogram[:] = 0
+
+        # Histograms can be coarser than the frame
+        cx, cy = frame.cx, frame.cy
+        if histogram.shape != frame.pixels.shape:
+            cx = np.linspace(cx[0], cx[-1], histogram.shape[0])
+            cy = np.linspace(cy[0], cy[-1], histogram.shape[1])
+
+        # Add a batch of samples to this worker's private histogram
+        sample_orbits(
+            histogram,
+            cx,
+            cy,
+            shared_memory.max_iters.value,
+            ORBIT_SAMPLES_PER_FRAME,
+            mode == RenderMode.ANTI_BUDDHABROT,
+            bool(shared_memory.importance_sampling.value),
+        )
+        self.syncer.worker_barrier()
+
+        # Each worker reduces its own lines across all histograms
+        shared_memory.density_peaks[self.id] = reduce_histograms(
+            frame.histograms, frame.density, orbit_start_line, orbit_end_line
+        )
+        self.syncer.worker_barrier()
+
+        shade_density(
+            frame.pixels,
+            frame.density,
+            max(shared_memory.density_peaks[:]),
+            start_line,
+            end_line,
+        )
+
 
 class WorkerManager:
     def __init__(self, viz) -> None:
@@ -54,6 +149,10 @@ class WorkerManager:
     def initialize_workers(self):
         if self.viz.controls.has_switched_workers:
             return
+        # Running workers must be parked at the end of a frame, otherwise
+        # they could render one more frame alongside the new ones
+        if self.syncer and not self.syncer.is_done:
+            return
         self.viz.controls.has_switched_workers = True
 
         logger.debug(f"Initializing {self.viz.controls.worker_type.value} workers.")
@@ -89,14 +188,20 @@ class WorkerManager:
 
 
 def thread_workers_process(viz, thread_syncer: "WorkerSynchronizer"):
+    threads = []
     for id in range(viz.number_of_workers):
         worker_args = (id, viz)
-        threading.Thread(
-            target=Worker(*worker_args, thread_syncer),
-            daemon=True,
-        ).start()
-    while not thread_syncer._terminate.value:
-        continue
+        threads.append(
+            threading.Thread(
+                target=Worker(*worker_args, thread_syncer),
+                daemon=True,
+            )
+        )
+        threads[-1].start()
+    # Stay alive until every worker has returned: a worker that dies while
+    # waiting on the continue event would block whoever sets it
+    for thread in threads:
+        thread.join()
 
 
 class WorkerSynchronizer:
@@ -108,8 +213,9 @@ class WorkerSynchronizer:
             else mp.Barrier(self.number_of_workers)
         )
         self._busy_flag = mp.Value("b", False)
-        self._continue_flag = mp.Value("b", False)
+        self._continue_event = mp.Event()
         self._done_flag = mp.Value("b", False)
+        self._done_event = mp.Event()
         self._terminate = mp.Value("b", False)
         self.has_initialized = False
 
@@ -117,26 +223,46 @@ class WorkerSynchronizer:
         if not self.has_initialized:
             self.has_initialized = True
         self._done_flag.value = False
-        self._continue_flag.value = True
+        self._done_event.clear()
+        self._continue_event.set()
 
     def worker_before_hook(self):
         """Called by the worker"""
         self._barrier.wait()
-        self._continue_flag.value = False
+        self._continue_event.clear()
         self._busy_flag.value = True
 
+    def worker_barrier(self):
+        """Called by the worker between phases of a frame"""
+        self._barrier.wait()
+
     def worker_after_hook(self):
         """Called by the worker"""
         self._barrier.wait()
         self._busy_flag.value = False
-        self._done_flag.value = True
-        while not self._continue_flag.value and not self._terminate.value:
-            time.sleep(0.05)
-            continue
+        # Only flag the frame as done once every worker is past this point,
+        # so a late worker can't mark the next frame done early
+        if self._barrier.wait() == 0:
+            self._done_flag.value = True
+            self._done_event.set()
+        # Wake up as soon as the frame is consumed, but keep checking for
+        # termination in case it raced with clearing the event
+        while not self._terminate.value:
+            if self._continue_event.wait(0.05):
+                break
+
+    def wait_until_done(self, timeout: float | None = None) -> bool:
+        return self._done_event.wait(timeout)
 
     def terminate_workers(self):
+        # Flag termination first so woken workers exit instead of starting
+        # another frame
         self._terminate.value = True
-        self._continue_flag.value = True
+        self._continue_event.set()
+
+    def abort(self):
+        """Called by the worker on exit, so nobody waits at a barrier for it"""
+        self._barrier.abort()
 
     @property
     def is_done(self):